@@ -0,0 +1,39 @@
+"""
+Generate the supplier profile snapshot bundle loaded by the Lambda at cold start.
+
+Usage:
+    python generate_supplier_snapshot.py --output supplier_snapshot.json.gz SUPPLIER_ID [SUPPLIER_ID ...]
+    python generate_supplier_snapshot.py --output supplier_snapshot.json.gz --supplier-file suppliers.txt
+
+Supplier service credentials are read from parameter store using the same
+SUPPLIER_* environment variables as the Lambda.
+"""
+import argparse
+
+from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
+from remote_tech_validation.core.clients.supplier_service_client import create_supplier_service_client
+from remote_tech_validation.core.clients.supplier_snapshot import build_supplier_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the supplier profile snapshot bundle")
+    parser.add_argument("supplier_ids", nargs="*", help="Supplier ids to include")
+    parser.add_argument("--supplier-file", help="File with one supplier id per line")
+    parser.add_argument("--output", default="supplier_snapshot.json.gz", help="Path of the bundle to write")
+    args = parser.parse_args()
+
+    supplier_ids = list(args.supplier_ids)
+    if args.supplier_file:
+        with open(args.supplier_file) as supplier_file:
+            supplier_ids.extend(line.strip() for line in supplier_file if line.strip())
+    if not supplier_ids:
+        parser.error("no supplier ids given")
+
+    supplier_service_client = create_supplier_service_client(AWSAdapter())
+    snapshot = build_supplier_snapshot(supplier_service_client, supplier_ids)
+    snapshot.save(args.output)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+End-to-end load test of lambda_handler against local stand-ins (see stand_ins.py).
+
+Each worker process plays one Lambda container: it keeps its warm state (MediaInfo
+worker, boto3 clients, ...) between requests and handles one request at a time, so
+--concurrency is the number of concurrently busy containers.
+
+Usage:
+    python -m load_test.harness --media-dir samples/ --requests 200 --concurrency 8 \
+        --latency s3=0.02 --error-rate supplier=0.01 --baseline <baseline.json>
+
+Exits non-zero when a regression against the baseline is found. Use --write-baseline
+with --baseline to record the current run as the new baseline. Baselines are machine
+specific, so none is committed; record one on the machine running the comparison.
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from load_test.stand_ins import (
+    AwsJsonStandIn,
+    CognitoStandIn,
+    Fault,
+    S3StandIn,
+    SupplierStandIn
+)
+
+LOAD_TEST_BUCKET = "load-test-bucket"
+# SSM parameter name -> environment variable the Lambda reads it from
+SUPPLIER_PARAMETERS = {
+    "/load-test/supplier/auth-endpoint": "SUPPLIER_AUTH_ENDPOINT",
+    "/load-test/supplier/client-id": "SUPPLIER_AUTH_CLIENT_ID",
+    "/load-test/supplier/client-secret": "SUPPLIER_AUTH_CLIENT_SECRET",
+    "/load-test/supplier/api-key": "SUPPLIER_API_KEY",
+    "/load-test/supplier/api-url": "SUPPLIER_API_URL"
+}
+PERCENTILES = (50, 95, 99)
+
+_stage_timings = None
+
+
+def _timed(stage: str, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if _stage_timings is not None:
+                _stage_timings[stage] = _stage_timings.get(stage, 0.0) + time.perf_counter() - start
+
+    return wrapper
+
+
+def _instrument_stages() -> None:
+    """Wrap the pipeline stages with timers; nothing is replaced, only measured."""
+    from remote_tech_validation import tech_validation_service
+    from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
+    from remote_tech_validation.core.adapters.media_info_adapter import MediaInfoAdapter
+    from remote_tech_validation.core.clients.supplier_service_client import SupplierServiceClient
+    from remote_tech_validation.core.idempotency import IdempotencyLayer
+
+    IdempotencyLayer._build_key = _timed("idempotency_key", IdempotencyLayer._build_key)
+    AWSAdapter.can_access_s3_access = _timed("s3_access", AWSAdapter.can_access_s3_access)
+    AWSAdapter.resolve_s3_location = _timed("s3_resolve", AWSAdapter.resolve_s3_location)
+    AWSAdapter.get_value_from_parameter_store = _timed("parameter_store", AWSAdapter.get_value_from_parameter_store)
+    SupplierServiceClient._get_cognito_token = _timed("cognito", SupplierServiceClient._get_cognito_token)
+    SupplierServiceClient.get_supplier_info = _timed("supplier_service", SupplierServiceClient.get_supplier_info)
+    SupplierServiceClient.get_content_profile = _timed("supplier_service", SupplierServiceClient.get_content_profile)
+    MediaInfoAdapter.build_profile_from_mediainfo = _timed(
+        "mediainfo", MediaInfoAdapter.build_profile_from_mediainfo
+    )
+    tech_validation_service._check_if_target_url_exists = _timed(
+        "target_url_check", tech_validation_service._check_if_target_url_exists
+    )
+    tech_validation_service.publish_cloudwatch_metric = _timed(
+        "metrics", tech_validation_service.publish_cloudwatch_metric
+    )
+
+
+class _Context:
+    """Minimal Lambda context giving every request the full timeout."""
+
+    def __init__(self, timeout_seconds: float):
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self._deadline - time.monotonic()) * 1000)
+
+
+def _run_request(request: dict) -> dict:
+    global _stage_timings
+    from remote_tech_validation.tech_validation_service import lambda_handler
+
+    _stage_timings = {}
+    event = {"body": json.dumps(request["payload"])}
+    start = time.perf_counter()
+    try:
+        response = lambda_handler(event, _Context(request["timeout"]))
+        status_code = response["statusCode"]
+    except Exception as e:
+        status_code = f"exception:{type(e).__name__}"
+    _stage_timings["total"] = time.perf_counter() - start
+    return {"status": status_code, "stages": _stage_timings}
+
+
+def _container_loop(request_queue, result_queue) -> None:
+    while (request := request_queue.get()) is not None:
+        result_queue.put(_run_request(request))
+
+
+def _run_containers(requests: list, concurrency: int) -> list:
+    # plain (non-daemon) processes rather than a Pool, as each container forks its own MediaInfo worker
+    mp_context = multiprocessing.get_context("fork")
+    request_queue = mp_context.Queue()
+    result_queue = mp_context.Queue()
+    for request in requests:
+        request_queue.put(request)
+    for _ in range(concurrency):
+        request_queue.put(None)
+
+    containers = [
+        mp_context.Process(target=_container_loop, args=(request_queue, result_queue))
+        for _ in range(concurrency)
+    ]
+    for container in containers:
+        container.start()
+    results = [result_queue.get() for _ in requests]
+    for container in containers:
+        container.join()
+    return results
+
+
+def _build_requests(args, media_files: list) -> list:
+    requests = []
+    for index in range(args.requests):
+        media_file = media_files[index % len(media_files)]
+        requests.append({
+            "timeout": args.lambda_timeout,
+            "payload": {
+                # unique asset ids so the idempotency layer doesn't replay responses
+                "assetId": f"LOADTEST{uuid.uuid4().hex[:12]}",
+                "filepath": f"s3://{LOAD_TEST_BUCKET}/{media_file}",
+                "supplierId": args.supplier_id
+            }
+        })
+    return requests
+
+
+def _percentile(values: list, percentile: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+def _summarise(results: list, elapsed: float) -> dict:
+    stages = {}
+    for result in results:
+        for stage, seconds in result["stages"].items():
+            stages.setdefault(stage, []).append(seconds * 1000)
+
+    status_counts = {}
+    for result in results:
+        status_counts[str(result["status"])] = status_counts.get(str(result["status"]), 0) + 1
+    errors = sum(count for status, count in status_counts.items() if not status.startswith(("2", "4")))
+
+    return {
+        "requests": len(results),
+        "throughput": len(results) / elapsed,
+        "error_rate": errors / len(results),
+        "status_counts": status_counts,
+        "stages_ms": {
+            stage: {f"p{percentile}": _percentile(values, percentile) for percentile in PERCENTILES}
+            for stage, values in sorted(stages.items())
+        }
+    }
+
+
+def _print_report(summary: dict) -> None:
+    print(f"requests:   {summary['requests']}")
+    print(f"throughput: {summary['throughput']:.2f} req/s")
+    print(f"error rate: {summary['error_rate']:.2%}")
+    print(f"statuses:   {summary['status_counts']}")
+    print(f"{'stage':<20}" + "".join(f"{f'p{percentile} ms':>12}" for percentile in PERCENTILES))
+    for stage, percentiles in summary["stages_ms"].items():
+        print(f"{stage:<20}" + "".join(f"{percentiles[f'p{p}']:>12.1f}" for p in PERCENTILES))
+
+
+def compare_with_baseline(
+        summary: dict,
+        baseline: dict,
+        tolerance: float,
+        error_rate_tolerance: float,
+        min_slowdown_ms: float
+) -> list:
+    """Return a description of every metric that regressed beyond the tolerance."""
+    regressions = []
+    if summary["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(f"throughput {summary['throughput']:.2f} < baseline {baseline['throughput']:.2f} req/s")
+    if summary["error_rate"] > baseline["error_rate"] + error_rate_tolerance:
+        regressions.append(f"error rate {summary['error_rate']:.2%} > baseline {baseline['error_rate']:.2%}")
+    for stage, baseline_percentiles in baseline["stages_ms"].items():
+        percentiles = summary["stages_ms"].get(stage)
+        if percentiles is None:
+            continue
+        for name, baseline_value in baseline_percentiles.items():
+            if percentiles[name] > baseline_value * (1 + tolerance) + min_slowdown_ms:
+                regressions.append(f"{stage} {name} {percentiles[name]:.1f}ms > baseline {baseline_value:.1f}ms")
+    return regressions
+
+
+def _parse_service_values(values: list, option: str) -> dict:
+    parsed = {}
+    for value in values or []:
+        service, _, number = value.partition("=")
+        if service not in ("s3", "ssm", "cognito", "supplier") or not number:
+            raise argparse.ArgumentTypeError(f"{option} expects <s3|ssm|cognito|supplier>=<number>, got {value}")
+        parsed[service] = float(number)
+    return parsed
+
+
+def _start_stand_ins(args) -> dict:
+    latency = _parse_service_values(args.latency, "--latency")
+    error_rate = _parse_service_values(args.error_rate, "--error-rate")
+
+    def fault(service):
+        return Fault(latency.get(service, 0.0), args.jitter, error_rate.get(service, 0.0))
+
+    profiles = None
+    if args.profiles:
+        with open(args.profiles) as profiles_file:
+            profiles = json.load(profiles_file)
+
+    cognito = CognitoStandIn(fault("cognito")).start()
+    supplier = SupplierStandIn(profiles, fault("supplier")).start()
+    parameter_values = {
+        "/load-test/supplier/auth-endpoint": f"{cognito.url}/oauth2/token",
+        "/load-test/supplier/client-id": "load-test-client",
+        "/load-test/supplier/client-secret": "load-test-secret",
+        "/load-test/supplier/api-key": "load-test-key",
+        "/load-test/supplier/api-url": supplier.url
+    }
+    return {
+        "s3": S3StandIn(args.media_dir, fault("s3")).start(),
+        "ssm": AwsJsonStandIn(parameter_values, fault("ssm")).start(),
+        "cognito": cognito,
+        "supplier": supplier
+    }
+
+
+def _configure_environment(stand_ins: dict, args) -> None:
+    os.environ.update({
+        "AWS_ACCESS_KEY_ID": "load-test",
+        "AWS_SECRET_ACCESS_KEY": "load-test",
+        "AWS_DEFAULT_REGION": "eu-west-2",
+        "AWS_REGION": "eu-west-2",
+        "REGION": "eu-west-2",
+        "ENVIRONMENT": "loadtest",
+        "AWS_ENDPOINT_URL_S3": stand_ins["s3"].url,
+        "AWS_ENDPOINT_URL_SSM": stand_ins["ssm"].url,
+        "AWS_ENDPOINT_URL_CLOUDWATCH_LOGS": stand_ins["ssm"].url,
+        "S3_ADDRESSING_STYLE": "path",
+        "WARM_UP_S3_BUCKETS": LOAD_TEST_BUCKET,
+        "SUPPLIER_SNAPSHOT_PATH": args.supplier_snapshot or os.path.join(tempfile.gettempdir(), "no-snapshot"),
+        "POWERTOOLS_LOG_LEVEL": "ERROR"
+    })
+    os.environ.pop("IDEMPOTENCY_TABLE_NAME", None)
+    os.environ.pop("SUPPLIER_SNAPSHOT_S3_URL", None)
+    for parameter_name, variable in SUPPLIER_PARAMETERS.items():
+        os.environ[variable] = parameter_name
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local end-to-end load test of the validation path")
+    parser.add_argument("--media-dir", required=True, help="Directory of sample media files served by the S3 stand-in")
+    parser.add_argument("--requests", type=int, default=100, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrently busy containers")
+    parser.add_argument("--supplier-id", default="LOADTEST")
+    parser.add_argument("--profiles", help="JSON list of content profiles served by the supplier stand-in")
+    parser.add_argument("--supplier-snapshot", help="Supplier snapshot bundle to load instead of the live calls")
+    parser.add_argument("--latency", action="append", help="Added latency in seconds, e.g. s3=0.02 (repeatable)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds on every latency")
+    parser.add_argument("--error-rate", action="append", help="Fraction of failed requests, e.g. supplier=0.05")
+    parser.add_argument("--lambda-timeout", type=float, default=900, help="Simulated Lambda timeout in seconds")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--write-baseline", action="store_true", help="Store this run as the --baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown per metric")
+    parser.add_argument("--error-rate-tolerance", type=float, default=0.01, help="Allowed error rate increase")
+    parser.add_argument("--min-slowdown-ms", type=float, default=5.0,
+                        help="Absolute slowdown ignored on every stage, so near-zero stages don't flap")
+    args = parser.parse_args()
+
+    media_files = sorted(
+        os.path.relpath(os.path.join(root, name), args.media_dir)
+        for root, _, names in os.walk(args.media_dir) for name in names
+    )
+    if args.write_baseline and not args.baseline:
+        parser.error("--write-baseline requires --baseline")
+    if not media_files:
+        parser.error(f"no media files in {args.media_dir}")
+
+    stand_ins = _start_stand_ins(args)
+    _configure_environment(stand_ins, args)
+    # import (and instrument) before forking so every container starts from the same state
+    _instrument_stages()
+
+    requests = _build_requests(args, media_files)
+    start = time.perf_counter()
+    results = _run_containers(requests, args.concurrency)
+    elapsed = time.perf_counter() - start
+
+    for stand_in in stand_ins.values():
+        stand_in.stop()
+
+    summary = _summarise(results, elapsed)
+    _print_report(summary)
+
+    if args.baseline and args.write_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(summary, baseline_file, indent=2)
+        print(f"Wrote baseline {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_with_baseline(summary, baseline, args.tolerance, args.error_rate_tolerance,
+                                              args.min_slowdown_ms)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
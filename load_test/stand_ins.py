@@ -0,0 +1,229 @@
+"""
+Local HTTP stand-ins for the services the validation path talks to: S3, SSM (and
+CloudWatch Logs, which share the AWS JSON protocol), the Cognito token endpoint
+and the supplier API. Each stand-in has configurable latency and error injection.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class Fault:
+    """Latency (seconds, uniformly jittered by +/- jitter) and error rate (0-1) of a stand-in."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    def apply(self) -> bool:
+        """Sleep for the configured latency, return True if this request should fail."""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        return random.random() < self.error_rate
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stand_in = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status: int, body: bytes = b"", headers: dict = None, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def reply_json(self, status: int, data: dict, content_type: str = "application/json"):
+        self.reply(status, json.dumps(data).encode(), content_type=content_type)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _handle(self):
+        body = self._read_body()
+        if self.stand_in.fault.apply():
+            self.reply_json(500, {"__type": "InternalServerError", "message": "injected error"})
+            return
+        self.stand_in.handle(self, body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = _handle
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # libmediainfo drops connections once it has read enough, that's not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandIn:
+    name = "stand-in"
+
+    def __init__(self, fault: Fault = None):
+        self.fault = fault or Fault()
+        handler_class = type(f"{type(self).__name__}Handler", (_StandInHandler,), {"stand_in": self})
+        self._server = _StandInServer(("127.0.0.1", 0), handler_class)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, request: _StandInHandler, body: bytes) -> None:
+        raise NotImplementedError
+
+
+class S3StandIn(StandIn):
+    """
+    Path-style S3 serving files from media_dir: s3://<any bucket>/<key> maps to media_dir/<key>.
+    Supports HEAD bucket, HEAD object and (ranged) GET object.
+    """
+    name = "s3"
+    _RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+    def __init__(self, media_dir: str, fault: Fault = None):
+        super().__init__(fault)
+        self._media_dir = os.path.abspath(media_dir)
+
+    def handle(self, request, body):
+        parts = unquote(urlparse(request.path).path).lstrip("/").split("/", 1)
+        if len(parts) == 1 or not parts[1]:
+            self._send_empty(request, 200)
+            return
+
+        path = os.path.abspath(os.path.join(self._media_dir, parts[1]))
+        if not path.startswith(self._media_dir + os.sep) or not os.path.isfile(path):
+            self._send_empty(request, 404)
+            return
+
+        stat = os.stat(path)
+        headers = {
+            "ETag": f'"{stat.st_size:x}-{int(stat.st_mtime):x}"',
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Accept-Ranges": "bytes"
+        }
+        if request.command == "HEAD":
+            request.send_response(200)
+            request.send_header("Content-Length", str(stat.st_size))
+            for name, value in headers.items():
+                request.send_header(name, value)
+            request.end_headers()
+            return
+
+        start, end = 0, stat.st_size - 1
+        status = 200
+        if match := self._RANGE.fullmatch(request.headers.get("Range", "")):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), end) if match.group(2) else end
+            elif match.group(2):
+                start = max(0, stat.st_size - int(match.group(2)))
+            if start > end:
+                request.reply(416, headers={"Content-Range": f"bytes */{stat.st_size}"})
+                return
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        with open(path, "rb") as media_file:
+            media_file.seek(start)
+            data = media_file.read(end - start + 1)
+        request.reply(status, data, headers=headers, content_type="application/octet-stream")
+
+    @staticmethod
+    def _send_empty(request, status):
+        request.send_response(status)
+        request.send_header("Content-Length", "0")
+        request.end_headers()
+
+
+class AwsJsonStandIn(StandIn):
+    """
+    SSM GetParameter plus the CloudWatch Logs calls made by metrics_logger.
+    Both use the AWS JSON protocol, dispatched on the X-Amz-Target header.
+    """
+    name = "ssm"
+
+    def __init__(self, parameters: dict, fault: Fault = None):
+        super().__init__(fault)
+        self._parameters = parameters
+
+    def handle(self, request, body):
+        target = request.headers.get("X-Amz-Target", "")
+        data = json.loads(body or b"{}")
+        content_type = "application/x-amz-json-1.1"
+
+        if target == "AmazonSSM.GetParameter":
+            name = data.get("Name")
+            if name not in self._parameters:
+                request.reply_json(400, {"__type": "ParameterNotFound"}, content_type)
+                return
+            request.reply_json(200, {"Parameter": {"Name": name, "Type": "String", "Value": self._parameters[name]}},
+                               content_type)
+        elif target.endswith(".DescribeLogStreams"):
+            request.reply_json(200, {"logStreams": [{"logStreamName": "load-test"}]}, content_type)
+        elif target.endswith(".PutLogEvents"):
+            request.reply_json(200, {"nextSequenceToken": "1"}, content_type)
+        elif target.endswith(".CreateLogStream"):
+            request.reply_json(200, {}, content_type)
+        else:
+            request.reply_json(400, {"__type": "UnknownOperationException"}, content_type)
+
+
+class CognitoStandIn(StandIn):
+    name = "cognito"
+
+    def handle(self, request, body):
+        request.reply_json(200, {"access_token": "load-test-token", "expires_in": 3600, "token_type": "Bearer"})
+
+
+class SupplierStandIn(StandIn):
+    """Every supplier gets all configured profiles; the default profile matches any media."""
+    name = "supplier"
+
+    def __init__(self, profiles: list = None, fault: Fault = None):
+        super().__init__(fault)
+        self._profiles = {
+            profile["contentProfileId"]: profile
+            for profile in profiles or [{"contentProfileId": "LOAD-TEST"}]
+        }
+
+    def handle(self, request, body):
+        parsed_url = urlparse(request.path)
+        query = parse_qs(parsed_url.query)
+        if parsed_url.path.endswith("/content/delivery/supplier"):
+            supplier_id = query.get("supplierId", [""])[0]
+            request.reply_json(200, {"supplierId": supplier_id, "contentProfile": list(self._profiles)})
+        elif parsed_url.path.endswith("/content/delivery/profile"):
+            profile = self._profiles.get(query.get("contentProfileId", [""])[0])
+            if profile is None:
+                request.reply_json(404, {"message": "Not found"})
+            else:
+                request.reply_json(200, profile)
+        else:
+            request.reply_json(404, {"message": "Not found"})
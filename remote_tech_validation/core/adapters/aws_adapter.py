@@ -1,102 +1,199 @@
+import json
 import os
-from urllib.parse import urlparse
+import threading
+import time
 
 import boto3
 from aws_lambda_powertools import Logger
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from remote_tech_validation.core.adapters.s3_location import S3Location
 from remote_tech_validation.core.exceptions.parameter_store_error import ParameterStoreError
 
+# parameter values are cached per container, refreshed after this many seconds to pick up rotations
+PARAMETER_CACHE_TTL_SECONDS = float(os.environ.get("PARAMETER_CACHE_TTL_SECONDS", "300"))
+
+_parameter_cache = {}
+_parameter_cache_lock = threading.Lock()
+
 
 class AWSAdapter:
-    def __init__(self, filepath: str, boto_client=boto3):
-        self._filepath = filepath
+    """
+    Stateless with regard to S3 objects: every operation takes an S3Location, so one
+    instance can be shared between threads. boto3 clients are created once and reused.
+    """
+
+    def __init__(self, boto_client=boto3):
         self._boto_client = boto_client
         self._logger = Logger()
-        self._initialise_properties()
-
-    def _initialise_properties(self):
-        self._parse_s3_url(self._filepath)
-        self._get_aws_region_from_bucket()
+        self._clients = {}
+        # creating clients from the default boto3 session is not thread-safe, using them is
+        self._clients_lock = threading.Lock()
+        # bucket name -> whether the role may read specific object versions (s3:GetObjectVersion)
+        self._version_access = {}
+        self._version_access_lock = threading.Lock()
 
     def get_value_from_parameter_store(self, parameter_name: str) -> str:
+        with _parameter_cache_lock:
+            cached = _parameter_cache.get(parameter_name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
         try:
             self._logger.info(f"Getting value from parameter store for '{parameter_name}'")
-            ssm = self._boto_client.client("ssm")
+            ssm = self._get_client("ssm")
             parameter_response = ssm.get_parameter(Name=parameter_name, WithDecryption=True)
-            return parameter_response["Parameter"]["Value"]
+            value = parameter_response["Parameter"]["Value"]
         except Exception:
             self._logger.error(f"Failed to get param store values for {parameter_name}")
             raise ParameterStoreError(parameter_name)
 
+        with _parameter_cache_lock:
+            _parameter_cache[parameter_name] = (value, time.monotonic() + PARAMETER_CACHE_TTL_SECONDS)
+        return value
+
+    def warm_up_s3(self, location: S3Location) -> None:
+        """
+        Create the S3 clients used for the location's region and open a connection to its bucket.
+
+        :raises ClientError: The bucket could not be reached, left to the caller to log
+        """
+        self._get_s3_signing_client(location.region)
+        self._get_client('s3', region_name=location.region).head_bucket(Bucket=location.bucket_name)
+
     # TODO should we write unit test for existing functionality?
-    def get_signed_url_for_asset(self):
-        s3_cli = self._boto_client.client(
-            "s3",
-            region_name=self._region,
-            config=Config(signature_version='s3v4', s3={'addressing_style': 'virtual'})
-        )
+    def get_signed_url_for_asset(self, location: S3Location):
+        s3_cli = self._get_s3_signing_client(location.region)
 
-        self._logger.info(f"GETTING SIGNED URL FOR {self._bucket_name} BUCKET AND {self._object_key} FILE")
+        self._logger.info(f"GETTING SIGNED URL FOR {location.bucket_name} BUCKET AND {location.object_key} FILE")
+        params = {"Bucket": location.bucket_name, "Key": location.object_key}
+        if location.version_id:
+            params["VersionId"] = location.version_id
         signed_url = s3_cli.generate_presigned_url(
             "get_object",
-            Params={"Bucket": self._bucket_name, "Key": self._object_key},
+            Params=params,
             ExpiresIn=300
         )
         self._logger.debug(f"SIGNED URL: {signed_url}")
         return signed_url
 
-    def can_access_s3_access(self) -> bool:
-        self._logger.info(f"Lambda trying to access bucket: {self._bucket_name} in {self._region} region")
-        s3 = self._boto_client.client('s3', region_name=self._region)
+    def can_access_s3_access(self, location: S3Location) -> bool:
+        self._logger.info(f"Lambda trying to access bucket: {location.bucket_name} in {location.region} region")
+        s3 = self._get_client('s3', region_name=location.region)
 
         try:
-            s3.head_bucket(Bucket=self._bucket_name)
+            s3.head_bucket(Bucket=location.bucket_name)
             self._logger.info(f"Verified access")
             return True
         except Exception as e:
-            self._logger.error(f"Failed to access {self._bucket_name} in {self._region}: {str(e)}")
+            self._logger.error(f"Failed to access {location.bucket_name} in {location.region}: {str(e)}")
             return False
 
-    def check_s3_url_file_exists(self, url=None) -> bool:
-        return self.check_s3_file_exists(url)
-
-    def check_s3_file_exists(self, url=None) -> bool:
+    def check_s3_url_file_exists(self, url: str) -> bool:
         self._logger.info(f"Checking if file exists in S3: {url}")
-        if url:
-            self._parse_s3_url(url)
-        self._logger.info(f"Checking if file exists in bucket: {self._bucket_name} with key: {self._object_key}")
-        s3_client = self._boto_client.client('s3', region_name=self._region)
+        return self.check_s3_file_exists(S3Location.from_url(url))
+
+    def check_s3_file_exists(self, location: S3Location) -> bool:
+        return self._head_object(location) is not None
+
+    def resolve_s3_location(self, location: S3Location) -> S3Location | None:
+        """
+        Pin the location to the object's current version so later reads see the object that was checked.
+        Versioned reads need s3:GetObjectVersion; without it the location is left unversioned.
+
+        :return: Location with version_id set (None on unversioned buckets or without
+            s3:GetObjectVersion), or None if the file does not exist
+        """
+        head_response = self._head_object(location)
+        if head_response is None:
+            return None
+        version_id = head_response.get("VersionId")
+        if version_id and self._can_read_object_versions(location.with_version(version_id)):
+            return location.with_version(version_id)
+        return location
+
+    def _can_read_object_versions(self, versioned_location: S3Location) -> bool:
+        bucket_name = versioned_location.bucket_name
+        with self._version_access_lock:
+            if bucket_name in self._version_access:
+                return self._version_access[bucket_name]
+
+        s3_client = self._get_client('s3', region_name=versioned_location.region)
+        try:
+            # called directly rather than through _head_object, an expected 403 shouldn't log an error
+            s3_client.head_object(
+                Bucket=bucket_name,
+                Key=versioned_location.object_key,
+                VersionId=versioned_location.version_id
+            )
+            can_read = True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code', None) not in ('403', 'AccessDenied'):
+                raise
+            self._logger.warning(f"No s3:GetObjectVersion on {bucket_name}, reading the latest version instead")
+            can_read = False
+
+        with self._version_access_lock:
+            self._version_access[bucket_name] = can_read
+        return can_read
+
+    def get_s3_object_etag(self, location: S3Location) -> str | None:
+        try:
+            head_response = self._head_object(location)
+        except ClientError as e:
+            self._logger.warning(f"Could not get ETag for {location.object_key}: {e}")
+            return None
+        return head_response.get("ETag") if head_response else None
+
+    def _head_object(self, location: S3Location) -> dict | None:
+        self._logger.info(f"Checking if file exists in bucket: {location.bucket_name} with key: {location.object_key}")
+        s3_client = self._get_client('s3', region_name=location.region)
 
         try:
-            s3_client.head_object(Bucket=self._bucket_name, Key=self._object_key)
+            params = {"Bucket": location.bucket_name, "Key": location.object_key}
+            if location.version_id:
+                params["VersionId"] = location.version_id
+            head_response = s3_client.head_object(**params)
             self._logger.info("File exists")
-            return True
+            return head_response
         except ClientError as e:
             if e.response.get('Error', {}).get('Code', None) == '404':
-                self._logger.info(f"File not found: {self._object_key}")
-                return False
+                self._logger.info(f"File not found: {location.object_key}")
+                return None
             else:
                 self._logger.error(f"Error checking if file exists: {e}", exc_info=True)
                 raise
 
-    def _get_aws_region_from_bucket(self) -> None:
-        env = os.environ.get("ENVIRONMENT")
-        bucket_region_map = {
-            f"{env}-cntdel-euc1-de-gap-cd-s3-bucket": "eu-central-1",
-            f"{env}-cntdel-euc1-de-gap-de-master-s3-bucket": "eu-central-1",
-            f"{env}-cntdel-skymaster-s3": "eu-west-2",
-            f"{env}-cntdel-gap-access-service-s3": "eu-west-2",
-            f"{env}-cntdel-gap-awm-s3": "eu-west-2",
-            f"{env}-cntdel-gap-cd-s3": "eu-west-2",
-            f"{env}-cntdel-gap-commercials-s3": "eu-west-2"
-        }
-        self._region = bucket_region_map.get(self._bucket_name, os.environ.get('REGION'))
-
-    def _parse_s3_url(self, s3_url: str) -> None:
-        parsed_url = urlparse(s3_url)
-        bucket_name = parsed_url.netloc  # The bucket name
-        object_key = parsed_url.path.lstrip("/")  # Remove leading slash to get object key
-        self._bucket_name = bucket_name
-        self._object_key = object_key
+    def _get_s3_signing_client(self, region_name: str | None):
+        return self._get_client(
+            "s3",
+            region_name=region_name,
+            signature_version='s3v4',
+            # path style is only needed against local S3 stand-ins (see load_test)
+            s3={'addressing_style': os.environ.get("S3_ADDRESSING_STYLE", "virtual")}
+        )
+
+    def _get_client(self, service_name: str, region_name: str = None, **config_options):
+        # keyed on the config values, so clients with different settings are never shared
+        client_key = (service_name, region_name, json.dumps(config_options, sort_keys=True))
+        with self._clients_lock:
+            if client_key not in self._clients:
+                kwargs = {"region_name": region_name} if region_name else {}
+                if config_options:
+                    kwargs["config"] = Config(**config_options)
+                self._clients[client_key] = self._boto_client.client(service_name, **kwargs)
+            return self._clients[client_key]
+
+
+_aws_adapter = None
+_aws_adapter_lock = threading.Lock()
+
+
+def get_aws_adapter() -> AWSAdapter:
+    """Return the adapter shared by every invocation in this container, so clients and connections are reused."""
+    global _aws_adapter
+    with _aws_adapter_lock:
+        if _aws_adapter is None:
+            _aws_adapter = AWSAdapter()
+        return _aws_adapter
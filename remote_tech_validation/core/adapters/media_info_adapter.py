@@ -1,9 +1,14 @@
 import json
 
 from aws_lambda_powertools import Logger
-from pymediainfo import MediaInfo
 
 from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
+from remote_tech_validation.core.adapters.media_info_worker import (
+    DEFAULT_TIMEOUT_SECONDS,
+    MediaInfoWorker,
+    get_media_info_worker
+)
+from remote_tech_validation.core.adapters.s3_location import S3Location
 from remote_tech_validation.core.exceptions.corrupted_file import CorruptedFile
 from remote_tech_validation.core.exceptions.media_info_error import MediaInfoError
 
@@ -12,10 +17,14 @@ class MediaInfoAdapter:
     def __init__(
             self,
             aws_adapter: AWSAdapter,
-            media_info=MediaInfo
+            s3_location: S3Location,
+            media_info_worker: MediaInfoWorker = None,
+            timeout: float = DEFAULT_TIMEOUT_SECONDS
     ):
         self._aws_adapter = aws_adapter
-        self._media_info = media_info
+        self._s3_location = s3_location
+        self._media_info_worker = media_info_worker or get_media_info_worker()
+        self._timeout = timeout
         self._logger = Logger()
 
     def build_profile_from_mediainfo(self) -> dict:
@@ -50,13 +59,9 @@ class MediaInfoAdapter:
         return media_info_profile
 
     def _get_media_info(self) -> dict:
-        signed_url = self._aws_adapter.get_signed_url_for_asset()
+        signed_url = self._aws_adapter.get_signed_url_for_asset(self._s3_location)
         self._logger.debug("LAUNCHING MEDIA INFO")
-        media_info_object = self._media_info.parse(
-            signed_url,
-            #library_file="/opt/libmediainfo.so.0"
-        )
-        media_info = json.loads(media_info_object.to_json())
+        media_info = json.loads(self._media_info_worker.parse(signed_url, self._timeout))
         self._logger.info('MEDIA INFO')
         self._logger.info(json.dumps(media_info))
         self._check_is_file_corrupted(media_info)
@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any
+
+from aws_lambda_powertools import Logger
+from pymediainfo import MediaInfo
+
+from remote_tech_validation.core.exceptions.media_info_error import MediaInfoError
+
+# seconds kept back from the remaining Lambda time so we can still respond after a timeout
+DEADLINE_MARGIN_SECONDS = float(os.environ.get("MEDIA_INFO_DEADLINE_MARGIN_SECONDS", "5"))
+# used when there is no Lambda context (local runs) and as an upper bound otherwise
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get("MEDIA_INFO_TIMEOUT_SECONDS", "600"))
+STARTUP_TIMEOUT_SECONDS = 10
+
+
+def get_parse_timeout(context: Any) -> float:
+    """
+    Work out how long a single MediaInfo parse may run for this invocation.
+
+    :param context: AWS Lambda context, or None when running locally
+    :return: Timeout in seconds, never negative
+    """
+    if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+        return DEFAULT_TIMEOUT_SECONDS
+    remaining = context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN_SECONDS
+    return max(0.0, min(remaining, DEFAULT_TIMEOUT_SECONDS))
+
+
+def _worker_loop(conn, media_info) -> None:
+    # load libmediainfo once, every parse in this process reuses it
+    conn.send(("ready", media_info.can_parse()))
+    while True:
+        try:
+            url = conn.recv()
+        except EOFError:
+            return
+        if url is None:
+            return
+        try:
+            conn.send(("ok", media_info.parse(url).to_json()))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # exception could not be pickled, send a plain error instead
+                conn.send(("error", MediaInfoError(f"{type(e).__name__}: {e}")))
+
+
+class MediaInfoWorker:
+    """
+    Runs MediaInfo in a pre-forked child process which is reused across invocations.
+
+    A parse exceeding its deadline kills the child and a fresh one is started straight away,
+    so a pathological file never takes the container down with it.
+    """
+
+    def __init__(self, media_info=MediaInfo, mp_context=None):
+        self._media_info = media_info
+        # Lambda has no /dev/shm, so stick to Process + Pipe which don't need it
+        self._mp_context = mp_context or multiprocessing.get_context("fork")
+        self._lock = threading.Lock()
+        self._logger = Logger()
+        self._process = None
+        self._conn = None
+        self._ready = False
+        self._spawned_at = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._is_alive():
+                self._spawn()
+
+    def warm_up(self, timeout: float = STARTUP_TIMEOUT_SECONDS) -> None:
+        """Start the worker if needed and wait until libmediainfo is loaded."""
+        with self._lock:
+            self._ensure_ready(time.monotonic() + timeout)
+
+    def parse(self, url: str, timeout: float) -> str:
+        """
+        Parse the given url in the worker process.
+
+        :param url: File path or (signed) URL to run MediaInfo against
+        :param timeout: Seconds allowed for the whole parse, including waiting for the worker to start
+        :raises MediaInfoError: The deadline was exceeded or the worker died
+        :return: MediaInfo output as a JSON string
+        """
+        if timeout <= 0:
+            # nothing we could do in time, leave the worker running for the next invocation
+            raise MediaInfoError("No time left to run MediaInfo")
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._ensure_ready(deadline)
+
+            self._conn.send(url)
+            if not self._conn.poll(max(0.0, deadline - time.monotonic())):
+                self._logger.error(f"MediaInfo did not finish within {timeout:.1f}s, restarting worker")
+                self._restart()
+                raise MediaInfoError(f"MediaInfo timed out after {timeout:.1f}s")
+
+            status, result = self._receive()
+
+        if status == "error":
+            raise result
+        return result
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._is_alive():
+                try:
+                    self._conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                self._process.join(timeout=1)
+            self._kill()
+
+    def _ensure_ready(self, deadline: float) -> None:
+        if not self._is_alive():
+            self._spawn()
+        if not self._ready:
+            self._wait_until_ready(deadline)
+
+    def _wait_until_ready(self, deadline: float) -> None:
+        startup_deadline = self._spawned_at + STARTUP_TIMEOUT_SECONDS
+        if not self._conn.poll(max(0.0, min(startup_deadline, deadline) - time.monotonic())):
+            if time.monotonic() < startup_deadline:
+                # only the caller's deadline ran out, the worker may still be loading libmediainfo
+                raise MediaInfoError("MediaInfo worker not ready before the deadline")
+            self._logger.error("MediaInfo worker did not start in time, restarting worker")
+            self._restart()
+            raise MediaInfoError("MediaInfo worker did not start in time")
+
+        _, can_parse = self._receive()
+        if not can_parse:
+            # don't leave an unusable worker behind, the next call should respawn straight away
+            self._kill()
+            raise MediaInfoError("libmediainfo could not be loaded")
+        self._ready = True
+        self._logger.debug("MediaInfo worker ready")
+
+    def _receive(self) -> tuple:
+        try:
+            return self._conn.recv()
+        except EOFError:
+            self._logger.error("MediaInfo worker exited unexpectedly, restarting worker")
+            self._restart()
+            raise MediaInfoError("MediaInfo worker exited unexpectedly")
+
+    def _is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _spawn(self) -> None:
+        self._kill()
+        parent_conn, child_conn = self._mp_context.Pipe()
+        self._process = self._mp_context.Process(
+            target=_worker_loop,
+            args=(child_conn, self._media_info),
+            daemon=True
+        )
+        self._process.start()
+        self._spawned_at = time.monotonic()
+        child_conn.close()
+        self._conn = parent_conn
+        self._ready = False
+        self._logger.info(f"Started MediaInfo worker (pid {self._process.pid})")
+
+    def _restart(self) -> None:
+        self._kill()
+        self._spawn()
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+            self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._ready = False
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_media_info_worker() -> MediaInfoWorker:
+    """Return the worker shared by every invocation in this container."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = MediaInfoWorker()
+        return _worker
@@ -0,0 +1,55 @@
+import os
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from urllib.parse import urlparse
+
+
+@dataclass(frozen=True)
+class S3Location:
+    """
+    Immutable pointer to an S3 object, safe to share between threads.
+    version_id is only set once the object has been resolved with AWSAdapter.resolve_s3_location.
+    """
+    bucket_name: str
+    object_key: str
+    region: str | None
+    version_id: str | None = None
+
+    @classmethod
+    def from_url(cls, s3_url: str) -> "S3Location":
+        bucket_name, object_key = _parse_s3_url(s3_url)
+        # looked up on every call, the environment can change after the parse is cached
+        return cls(bucket_name, object_key, _get_aws_region_from_bucket(bucket_name))
+
+    def with_version(self, version_id: str | None) -> "S3Location":
+        return replace(self, version_id=version_id)
+
+    @property
+    def url(self) -> str:
+        return f"s3://{self.bucket_name}/{self.object_key}"
+
+
+@lru_cache(maxsize=256)
+def _parse_s3_url(s3_url: str) -> tuple[str, str]:
+    parsed_url = urlparse(s3_url)
+    bucket_name = parsed_url.netloc  # The bucket name
+    object_key = parsed_url.path.lstrip("/")  # Remove leading slash to get object key
+    return bucket_name, object_key
+
+
+def get_known_bucket_regions() -> dict:
+    """Buckets this service reads from, mapped to their region."""
+    env = os.environ.get("ENVIRONMENT")
+    return {
+        f"{env}-cntdel-euc1-de-gap-cd-s3-bucket": "eu-central-1",
+        f"{env}-cntdel-euc1-de-gap-de-master-s3-bucket": "eu-central-1",
+        f"{env}-cntdel-skymaster-s3": "eu-west-2",
+        f"{env}-cntdel-gap-access-service-s3": "eu-west-2",
+        f"{env}-cntdel-gap-awm-s3": "eu-west-2",
+        f"{env}-cntdel-gap-cd-s3": "eu-west-2",
+        f"{env}-cntdel-gap-commercials-s3": "eu-west-2"
+    }
+
+
+def _get_aws_region_from_bucket(bucket_name: str) -> str | None:
+    return get_known_bucket_regions().get(bucket_name, os.environ.get('REGION'))
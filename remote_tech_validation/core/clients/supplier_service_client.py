@@ -1,10 +1,24 @@
 import base64
+import os
+import threading
+import time
+
 import requests
 from aws_lambda_powertools import Logger
 
+from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
 from remote_tech_validation.core.exceptions.profile_not_found import ProfileNotFound
 from remote_tech_validation.core.exceptions.supplier_not_found import SupplierNotFound
 
+# shared so connections to Cognito and the supplier API are pooled across invocations
+_session = requests.Session()
+# refresh tokens this many seconds before they expire
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+# (auth_url, client_id) -> (access token, monotonic expiry)
+_token_cache = {}
+_token_cache_lock = threading.Lock()
+
 
 class SupplierServiceClient:
     def __init__(
@@ -14,7 +28,7 @@ class SupplierServiceClient:
             client_secret: str,
             api_key: str,
             base_url: str,
-            _requests=requests
+            _requests=_session
     ):
         self._auth_url = auth_url
         self._client_id = client_id
@@ -23,11 +37,7 @@ class SupplierServiceClient:
         self._base_url = base_url
         self._requests = _requests
         self._logger = Logger()
-        self._header = {
-            "Authorization": f"Bearer {self._get_cognito_token()}",
-            "Content-Type": "application/json",
-            "x-api-key": self._api_key
-        }
+        self._header = self._build_header()
 
     # TODO
     # align logger with other services
@@ -35,7 +45,7 @@ class SupplierServiceClient:
         supplier_endpoint = f"{self._base_url}/content/delivery/supplier?supplierId={supplier_id}"
         self._logger.info(f"GET Request Sent to {supplier_endpoint}")
 
-        response = self._requests.get(supplier_endpoint, headers=self._header)
+        response = self._get(supplier_endpoint)
         if response.status_code == 404:
             raise SupplierNotFound(supplier_id)
 
@@ -49,7 +59,7 @@ class SupplierServiceClient:
         profile_endpoint = f"{self._base_url}/content/delivery/profile?contentProfileId={profile_id}"
         self._logger.info(f"GET Request Sent to {profile_endpoint}")
 
-        response = self._requests.get(profile_endpoint, headers=self._header)
+        response = self._get(profile_endpoint)
         if response.status_code == 404:
             raise ProfileNotFound(profile_id)
 
@@ -59,7 +69,41 @@ class SupplierServiceClient:
 
         return resp_body
 
-    def _get_cognito_token(self):
+    def warm_up_connection(self) -> None:
+        """Open a pooled connection to the supplier API, the response itself doesn't matter."""
+        self._requests.head(self._base_url, headers=self._header)
+
+    def _get(self, endpoint: str):
+        response = self._requests.get(endpoint, headers=self._header)
+        if response.status_code == 401:
+            # the cached token was rejected (e.g. revoked), drop it and retry once with a fresh one
+            self._logger.warning("Supplier API rejected the Cognito token, fetching a new one")
+            with _token_cache_lock:
+                _token_cache.pop((self._auth_url, self._client_id), None)
+            self._header = self._build_header()
+            response = self._requests.get(endpoint, headers=self._header)
+        return response
+
+    def _build_header(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self._get_cached_cognito_token()}",
+            "Content-Type": "application/json",
+            "x-api-key": self._api_key
+        }
+
+    def _get_cached_cognito_token(self) -> str:
+        cache_key = (self._auth_url, self._client_id)
+        with _token_cache_lock:
+            cached = _token_cache.get(cache_key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        token, expires_in = self._get_cognito_token()
+        with _token_cache_lock:
+            _token_cache[cache_key] = (token, time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN_SECONDS)
+        return token
+
+    def _get_cognito_token(self) -> tuple:
         auth_string = base64.b64encode(f"{self._client_id}:{self._client_secret}".encode()).decode()
         response = self._requests.post(
             url=self._auth_url,
@@ -72,4 +116,16 @@ class SupplierServiceClient:
         self._logger.debug(response)
         response.raise_for_status()
 
-        return response.json()['access_token']
+        token_response = response.json()
+        return token_response['access_token'], token_response.get('expires_in', 3600)
+
+
+def create_supplier_service_client(aws_adapter: AWSAdapter) -> SupplierServiceClient:
+    """Create a client using the endpoints and credentials held in parameter store."""
+    return SupplierServiceClient(
+        auth_url=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_ENDPOINT")),
+        client_id=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_CLIENT_ID")),
+        client_secret=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_CLIENT_SECRET")),
+        api_key=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_API_KEY")),
+        base_url=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_API_URL"))
+    )
@@ -0,0 +1,163 @@
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlparse
+
+import boto3
+from aws_lambda_powertools import Logger
+
+from remote_tech_validation.core.exceptions.profile_not_found import ProfileNotFound
+from remote_tech_validation.core.exceptions.supplier_not_found import SupplierNotFound
+
+SNAPSHOT_FORMAT_VERSION = 1
+# packaged in the Lambda layer, overridden by SUPPLIER_SNAPSHOT_PATH / SUPPLIER_SNAPSHOT_S3_URL
+DEFAULT_SNAPSHOT_PATH = "/opt/supplier_snapshot.json.gz"
+DEFAULT_MAX_AGE_SECONDS = 86400
+LOAD_RETRY_BACKOFF_SECONDS = 60
+
+logger = Logger()
+
+
+class SupplierSnapshot:
+    """
+    Read-only copy of the supplier-to-content-profile catalogue.
+
+    File layout (gzipped JSON):
+    {"version": 1, "generatedAt": <epoch seconds>, "suppliers": {id: supplier}, "profiles": {id: profile}}
+    """
+
+    def __init__(self, suppliers: dict, profiles: dict, generated_at: float):
+        self._suppliers = suppliers
+        self._profiles = profiles
+        self.generated_at = generated_at
+
+    @classmethod
+    def load(cls, path: str) -> "SupplierSnapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+            data = json.load(snapshot_file)
+
+        if data.get("version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported supplier snapshot version {data.get('version')}")
+        return cls(data["suppliers"], data["profiles"], data["generatedAt"])
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "generatedAt": self.generated_at,
+            "suppliers": self._suppliers,
+            "profiles": self._profiles
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as snapshot_file:
+            json.dump(data, snapshot_file, separators=(",", ":"))
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        return time.time() - self.generated_at > max_age_seconds
+
+    def get_supplier_info(self, supplier_id: str) -> dict | None:
+        return self._suppliers.get(supplier_id)
+
+    def get_content_profile(self, profile_id: str) -> dict | None:
+        return self._profiles.get(profile_id)
+
+
+class SnapshotSupplierServiceClient:
+    """
+    Serves supplier and profile lookups from the snapshot, only creating the live
+    SupplierServiceClient (SSM lookups and Cognito token) when something is missing.
+    """
+
+    def __init__(self, snapshot: SupplierSnapshot | None, live_client_factory: Callable):
+        self._snapshot = snapshot
+        self._live_client_factory = live_client_factory
+        self._live_client = None
+        self._logger = Logger()
+
+    def get_supplier_info(self, supplier_id: str):
+        if self._snapshot and (supplier_info := self._snapshot.get_supplier_info(supplier_id)) is not None:
+            self._logger.info(f"Supplier {supplier_id} served from snapshot")
+            return supplier_info
+        return self._get_live_client().get_supplier_info(supplier_id)
+
+    def get_content_profile(self, profile_id: str):
+        if self._snapshot and (profile := self._snapshot.get_content_profile(profile_id)) is not None:
+            self._logger.info(f"Profile {profile_id} served from snapshot")
+            return profile
+        return self._get_live_client().get_content_profile(profile_id)
+
+    def _get_live_client(self):
+        if self._live_client is None:
+            self._live_client = self._live_client_factory()
+        return self._live_client
+
+
+_snapshot = None
+_snapshot_loaded = False
+_next_load_attempt = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def get_supplier_snapshot(boto_client=boto3) -> SupplierSnapshot | None:
+    """
+    Load the snapshot once per container, from S3 if SUPPLIER_SNAPSHOT_S3_URL is set,
+    otherwise from the layer. Returns None when there is no usable (fresh) snapshot.
+    """
+    global _snapshot, _snapshot_loaded, _next_load_attempt
+    with _snapshot_lock:
+        if not _snapshot_loaded and time.monotonic() >= _next_load_attempt:
+            try:
+                _snapshot = _load_snapshot(boto_client)
+                _snapshot_loaded = True
+            except Exception as e:
+                # e.g. a transient S3 error, try again later rather than going live for the container's lifetime
+                logger.error(f"Failed to load supplier snapshot, using live supplier service: {e}")
+                _next_load_attempt = time.monotonic() + LOAD_RETRY_BACKOFF_SECONDS
+
+    max_age = float(os.environ.get("SUPPLIER_SNAPSHOT_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS))
+    if _snapshot is not None and _snapshot.is_stale(max_age):
+        logger.warning("Supplier snapshot is stale, using live supplier service")
+        return None
+    return _snapshot
+
+
+def _load_snapshot(boto_client) -> SupplierSnapshot | None:
+    path = os.environ.get("SUPPLIER_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+    if s3_url := os.environ.get("SUPPLIER_SNAPSHOT_S3_URL"):
+        parsed_url = urlparse(s3_url)
+        path = "/tmp/supplier_snapshot.json.gz"
+        logger.info(f"Downloading supplier snapshot from {s3_url}")
+        boto_client.client("s3").download_file(parsed_url.netloc, parsed_url.path.lstrip("/"), path)
+    if not os.path.isfile(path):
+        logger.info(f"No supplier snapshot at {path}")
+        return None
+    snapshot = SupplierSnapshot.load(path)
+    logger.info(f"Loaded supplier snapshot generated at {snapshot.generated_at}")
+    return snapshot
+
+
+def build_supplier_snapshot(supplier_service_client, supplier_ids: list) -> SupplierSnapshot:
+    """
+    Fetch the given suppliers and all of their content profiles from the supplier service.
+    Suppliers or profiles that are not found are left out, so they go to the live service.
+    """
+    suppliers = {}
+    profiles = {}
+    for supplier_id in supplier_ids:
+        try:
+            supplier_info = supplier_service_client.get_supplier_info(supplier_id)
+        except SupplierNotFound as e:
+            logger.warning(e.message)
+            continue
+        suppliers[supplier_id] = supplier_info
+
+        for profile_id in supplier_info.get("contentProfile", []):
+            if profile_id in profiles:
+                continue
+            try:
+                profiles[profile_id] = supplier_service_client.get_content_profile(profile_id)
+            except ProfileNotFound as e:
+                logger.warning(e.message)
+
+    return SupplierSnapshot(suppliers, profiles, time.time())
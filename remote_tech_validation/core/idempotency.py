@@ -0,0 +1,215 @@
+import copy
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+import boto3
+from aws_lambda_powertools import Logger
+
+from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter, get_aws_adapter
+from remote_tech_validation.core.adapters.s3_location import S3Location
+from remote_tech_validation.core.exceptions.corrupted_file import CorruptedFile
+
+logger = Logger()
+
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "3600"))
+# responses driven by supplier config or target state, which can change without touching the object
+CONFIG_FAILURE_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_CONFIG_FAILURE_TTL_SECONDS", "60"))
+
+
+class InMemoryIdempotencyStore:
+    """
+    Local stand-in for the idempotency store, only shared within one container.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            response, expiration = item
+            if expiration <= time.time():
+                del self._items[key]
+                return None
+            return response
+
+    def put(self, key: str, response: dict, ttl: int) -> None:
+        with self._lock:
+            now = time.time()
+            for expired_key in [k for k, (_, expiration) in self._items.items() if expiration <= now]:
+                del self._items[expired_key]
+            self._items[key] = (response, now + ttl)
+
+
+class DynamoDBIdempotencyStore:
+    """
+    Idempotency store shared across containers, backed by a DynamoDB table keyed on "id"
+    with "expiration" configured as the table TTL attribute.
+    """
+
+    def __init__(self, table_name: str, boto_client=boto3):
+        self._table_name = table_name
+        self._dynamodb = boto_client.client("dynamodb")
+
+    def get(self, key: str) -> dict | None:
+        item = self._dynamodb.get_item(
+            TableName=self._table_name,
+            Key={"id": {"S": key}},
+            ConsistentRead=True
+        ).get("Item")
+        # DynamoDB TTL deletion is lazy, so expired items can still be returned
+        if item is None or int(item["expiration"]["N"]) <= time.time():
+            return None
+        return json.loads(item["response"]["S"])
+
+    def put(self, key: str, response: dict, ttl: int) -> None:
+        self._dynamodb.put_item(
+            TableName=self._table_name,
+            Item={
+                "id": {"S": key},
+                "response": {"S": json.dumps(response)},
+                "expiration": {"N": str(int(time.time()) + ttl)}
+            }
+        )
+
+
+def get_default_store():
+    table_name = os.environ.get("IDEMPOTENCY_TABLE_NAME")
+    if table_name:
+        return DynamoDBIdempotencyStore(table_name)
+    return InMemoryIdempotencyStore()
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+class IdempotencyLayer:
+    """
+    Coalesces duplicate validations running in this container and replays completed
+    responses from the store within the TTL.
+    """
+
+    def __init__(
+            self,
+            store=None,
+            ttl: int = IDEMPOTENCY_TTL_SECONDS,
+            config_failure_ttl: int = CONFIG_FAILURE_TTL_SECONDS,
+            aws_adapter: AWSAdapter = None
+    ):
+        self._store = store
+        self._ttl = ttl
+        self._config_failure_ttl = config_failure_ttl
+        self._aws_adapter = aws_adapter or get_aws_adapter()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, handler: Callable[[dict, Any], dict]) -> Callable[[dict, Any], dict]:
+        @functools.wraps(handler)
+        def wrapper(event: dict, context: Any) -> dict:
+            key = self._build_key(event)
+            if key is None:
+                return handler(event, context)
+            return self._run_once(key, handler, event, context)
+
+        return wrapper
+
+    def warm_up(self) -> None:
+        """Create the store, and its client, and open a connection to it."""
+        self._get_store().get("warm-up")
+
+    def _run_once(self, key: str, handler: Callable, event: dict, context: Any) -> dict:
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            is_owner = in_flight is None
+            if is_owner:
+                in_flight = self._in_flight[key] = _InFlight()
+
+        if not is_owner:
+            logger.info(f"Waiting for in-flight validation {key}")
+            in_flight.done.wait()
+            if in_flight.response is not None:
+                return copy.deepcopy(in_flight.response)
+            # the first execution failed, so run our own
+            return handler(event, context)
+
+        try:
+            stored_response = self._get_stored_response(key)
+            if stored_response is not None:
+                logger.info(f"Replaying stored response for {key}")
+                in_flight.response = stored_response
+                return copy.deepcopy(stored_response)
+
+            response = handler(event, context)
+            in_flight.response = response
+            self._store_response(key, response)
+            return copy.deepcopy(response)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def _build_key(self, event: dict) -> str | None:
+        try:
+            payload = json.loads(event["body"])
+            filepath = payload.get("filepath")
+            if not filepath:
+                return None
+            etag = self._aws_adapter.get_s3_object_etag(S3Location.from_url(filepath))
+        except Exception as e:
+            logger.warning(f"Could not build idempotency key, running without it: {e}")
+            return None
+
+        if etag is None:
+            # without an ETag we can't tell whether the object changed since the last run
+            return None
+        key_source = json.dumps({"payload": payload, "etag": etag}, sort_keys=True)
+        return hashlib.sha256(key_source.encode()).hexdigest()
+
+    def _get_stored_response(self, key: str) -> dict | None:
+        try:
+            return self._get_store().get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read idempotency store: {e}")
+            return None
+
+    def _store_response(self, key: str, response: dict) -> None:
+        # server errors are usually transient, a retry should run the validation again
+        if response.get("statusCode", 500) >= 500:
+            return
+        try:
+            self._get_store().put(key, response, self._get_ttl(response))
+        except Exception as e:
+            logger.warning(f"Failed to write idempotency store: {e}")
+
+    def _get_ttl(self, response: dict) -> int:
+        # only a verdict decided by the object alone keeps the full TTL; a 200 also depends on
+        # supplier profiles and on the target URL not existing yet, both of which can change
+        if self._get_error_message(response) == CorruptedFile().message:
+            return self._ttl
+        return self._config_failure_ttl
+
+    @staticmethod
+    def _get_error_message(response: dict) -> str | None:
+        try:
+            return json.loads(response.get("body", "{}")).get("errorMessage")
+        except (TypeError, ValueError):
+            return None
+
+    def _get_store(self):
+        if self._store is None:
+            self._store = get_default_store()
+        return self._store
+
+
+idempotent = IdempotencyLayer()
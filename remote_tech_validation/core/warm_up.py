@@ -0,0 +1,109 @@
+import functools
+import json
+import os
+import time
+from typing import Any, Callable
+
+from aws_lambda_powertools import Logger
+
+from remote_tech_validation.core import metrics_logger
+from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
+from remote_tech_validation.core.adapters.media_info_worker import get_media_info_worker
+from remote_tech_validation.core.adapters.s3_location import S3Location
+from remote_tech_validation.core.clients.supplier_snapshot import get_supplier_snapshot
+from remote_tech_validation.core.idempotency import idempotent
+
+logger = Logger()
+
+
+def is_warm_up_event(event: dict) -> bool:
+    """
+    Warm-up pings are either {"warmup": true} or an EventBridge scheduled event.
+    """
+    if not isinstance(event, dict):
+        return False
+    return bool(event.get("warmup")) or (
+        event.get("source") == "aws.events" and event.get("detail-type") == "Scheduled Event"
+    )
+
+
+def should_warm_up_on_init() -> bool:
+    return (os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"
+            or os.environ.get("WARM_UP_ON_INIT", "").lower() == "true")
+
+
+def warm_up(aws_adapter: AWSAdapter, supplier_client_factory: Callable) -> dict:
+    """
+    Pre-initialise everything the first real request would otherwise pay for.
+    A failing step is logged and reported but doesn't stop the others.
+
+    :param aws_adapter: Adapter shared with the handler, so its boto3 clients are the ones warmed
+    :param supplier_client_factory: Creates a live SupplierServiceClient; param store values and the
+        Cognito token it fetches stay cached for the following requests
+    :return: Milliseconds per step, or the error for steps that failed
+    """
+    steps = [
+        # first, so the worker is forked before boto3 and requests start any threads
+        ("mediainfo", lambda: get_media_info_worker().warm_up()),
+        ("supplier_snapshot", get_supplier_snapshot),
+        ("s3", lambda: _warm_up_s3(aws_adapter)),
+        ("idempotency_store", idempotent.warm_up),
+        ("supplier_service", lambda: supplier_client_factory().warm_up_connection()),
+        ("cloudwatch_logs", metrics_logger.get_latest_log_stream)
+    ]
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            timings[name] = f"failed: {type(e).__name__}: {e}"
+
+    logger.info(f"Warm-up timings: {timings}")
+    return timings
+
+
+def _warm_up_s3(aws_adapter: AWSAdapter) -> None:
+    # only the buckets this deployment reads from; each needs its own connection,
+    # as virtual-hosted requests go to a separate host per bucket
+    bucket_names = [name.strip() for name in os.environ.get("WARM_UP_S3_BUCKETS", "").split(",") if name.strip()]
+    if not bucket_names:
+        logger.info("No WARM_UP_S3_BUCKETS configured, skipping S3 warm-up")
+        return
+
+    failed = []
+    for bucket_name in bucket_names:
+        try:
+            aws_adapter.warm_up_s3(S3Location.from_url(f"s3://{bucket_name}/"))
+        except Exception as e:
+            logger.warning(f"Could not warm up S3 bucket {bucket_name}: {e}")
+            failed.append(bucket_name)
+    if failed:
+        raise RuntimeError(f"S3 warm-up failed for {', '.join(failed)}")
+
+
+def handle_warm_up(aws_adapter: AWSAdapter, supplier_client_factory: Callable):
+    """
+    Decorator answering warm-up events with an init-timing report instead of running the handler.
+    """
+    def decorator(handler: Callable[[dict, Any], dict]) -> Callable[[dict, Any], dict]:
+        @functools.wraps(handler)
+        def wrapper(event: dict, context: Any) -> dict:
+            if not is_warm_up_event(event):
+                return handler(event, context)
+
+            logger.info("Warm-up event received")
+            return {
+                "statusCode": 200,
+                "body": json.dumps({
+                    "message": "Warm-up completed",
+                    "initTimings": warm_up(aws_adapter, supplier_client_factory)
+                }),
+            }
+
+        return wrapper
+
+    return decorator
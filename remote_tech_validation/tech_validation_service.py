@@ -1,25 +1,33 @@
 import json
-import os
 from typing import Any
 
 from aws_lambda_powertools import Logger
 
-from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
+from remote_tech_validation.core.adapters.aws_adapter import get_aws_adapter
 from remote_tech_validation.core.adapters.media_info_adapter import MediaInfoAdapter
-from remote_tech_validation.core.clients.supplier_service_client import SupplierServiceClient
+from remote_tech_validation.core.adapters.media_info_worker import get_parse_timeout
+from remote_tech_validation.core.adapters.s3_location import S3Location
+from remote_tech_validation.core.clients.supplier_service_client import create_supplier_service_client
+from remote_tech_validation.core.clients.supplier_snapshot import SnapshotSupplierServiceClient, get_supplier_snapshot
 from remote_tech_validation.core.exceptions.corrupted_file import CorruptedFile
 from remote_tech_validation.core.exceptions.media_info_error import MediaInfoError
 from remote_tech_validation.core.exceptions.parameter_store_error import ParameterStoreError
 from remote_tech_validation.core.exceptions.profile_not_found import ProfileNotFound
 from remote_tech_validation.core.exceptions.supplier_not_found import SupplierNotFound
+from remote_tech_validation.core.idempotency import idempotent
 from remote_tech_validation.core.metrics_logger import publish_cloudwatch_metric
 from remote_tech_validation.core.profile_matcher import ProfileMatcher
 from remote_tech_validation.core.skip_full_valdation import SkipValidator
 from remote_tech_validation.core.url_checker import _check_if_target_url_exists
+from remote_tech_validation.core.warm_up import handle_warm_up, should_warm_up_on_init, warm_up
 
 logger = Logger()
+# shared across invocations (and with the idempotency layer) so boto3 clients and their connection pools are reused
+aws_adapter = get_aws_adapter()
 
 
+@handle_warm_up(aws_adapter, lambda: create_supplier_service_client(aws_adapter))
+@idempotent
 def lambda_handler(event: dict, context: Any) -> dict:
     """Handler for running mediainfo
     :param event: AWS APIGW Event
@@ -38,7 +46,7 @@ def lambda_handler(event: dict, context: Any) -> dict:
     media_id = payload.get('assetId')
     filepath = payload.get('filepath')
 
-    aws_adapter = AWSAdapter(filepath=filepath)
+    s3_location = S3Location.from_url(filepath)
 
     if SkipValidator.should_skip(filepath):
         logger.info(f"Skipping validation for extension of filepath: {filepath}")
@@ -58,7 +66,7 @@ def lambda_handler(event: dict, context: Any) -> dict:
         }
 
     # check bucket permission (of different region)
-    if not aws_adapter.can_access_s3_access():
+    if not aws_adapter.can_access_s3_access(s3_location):
         publish_cloudwatch_metric("FailedChecks", media_id, "Error accessing S3 bucket")
         cant_access_bucket_response = {
             "statusCode": 500,
@@ -70,8 +78,9 @@ def lambda_handler(event: dict, context: Any) -> dict:
         logger.info(f"RETURNING WITH {cant_access_bucket_response}")
         return cant_access_bucket_response
 
-    # validate file existence (filepath from request)
-    if not aws_adapter.check_s3_file_exists():
+    # validate file existence (filepath from request), pinning the version we go on to validate
+    s3_location = aws_adapter.resolve_s3_location(s3_location)
+    if s3_location is None:
         publish_cloudwatch_metric("FailedChecks", media_id, "File not found")
         file_not_found_response = {
             "statusCode": 404,
@@ -84,12 +93,10 @@ def lambda_handler(event: dict, context: Any) -> dict:
         return file_not_found_response
 
     try:
-        supplier_service_client = SupplierServiceClient(
-            auth_url=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_ENDPOINT")),
-            client_id=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_CLIENT_ID")),
-            client_secret=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_AUTH_CLIENT_SECRET")),
-            api_key=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_API_KEY")),
-            base_url=aws_adapter.get_value_from_parameter_store(os.environ.get("SUPPLIER_API_URL"))
+        # live client (param store + cognito token) is only created for suppliers missing from the snapshot
+        supplier_service_client = SnapshotSupplierServiceClient(
+            get_supplier_snapshot(),
+            lambda: create_supplier_service_client(aws_adapter)
         )
 
         supplier_id = payload.get('supplierId')
@@ -121,7 +128,7 @@ def lambda_handler(event: dict, context: Any) -> dict:
         logger.info('Content profiles:')
         logger.info(json.dumps(content_profiles_list))
 
-        media_info_adapter = MediaInfoAdapter(aws_adapter)
+        media_info_adapter = MediaInfoAdapter(aws_adapter, s3_location, timeout=get_parse_timeout(context))
         media_profile = media_info_adapter.build_profile_from_mediainfo()
 
         # check the media profile matches one of the supplier content profiles
@@ -229,3 +236,8 @@ def _get_full_path(target_url: str, filename: str) -> str:
 def _get_file_extension(filename: str) -> str:
     parts = filename.split(".")
     return f".{parts[-1]}" if len(parts) > 1 else None
+
+
+# provisioned concurrency (or WARM_UP_ON_INIT=true) warms up during init, before any request arrives
+if should_warm_up_on_init():
+    warm_up(aws_adapter, lambda: create_supplier_service_client(aws_adapter))
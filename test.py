@@ -4,6 +4,7 @@ import os
 
 from remote_tech_validation.core.adapters.aws_adapter import AWSAdapter
 from remote_tech_validation.core.adapters.media_info_adapter import MediaInfoAdapter
+from remote_tech_validation.core.adapters.s3_location import S3Location
 
 
 logger = logging.getLogger(__name__)
@@ -16,8 +17,8 @@ def lambda_handler(event: dict, context: dict) -> dict:
     payload = json.loads(event.get("body", "{}"))
     filepath = payload.get("filepath")
 
-    aws_adapter = AWSAdapter(filepath=filepath)
-    media_info_adapter = MediaInfoAdapter(aws_adapter)
+    aws_adapter = AWSAdapter()
+    media_info_adapter = MediaInfoAdapter(aws_adapter, S3Location.from_url(filepath))
     media_profile = media_info_adapter.build_profile_from_mediainfo()
 
 